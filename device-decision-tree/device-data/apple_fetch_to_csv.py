@@ -1,36 +1,38 @@
 # apple_fetch_to_csv.py
 # Scrape Apple India for current Mac & iPad lineups and save to CSVs.
 # - Uses Playwright to load pages and capture embedded JSON where possible
-# - Falls back to DOM parsing
+# - Reads buy-page prices from the page text (lxml)
 # - Heuristically parses "From ₹..." prices (compare pages sometimes expose only tokens)
 #
 # Install:
 # python -m venv .venv && source .venv/bin/activate
-#pip install playwright bs4 lxml pandas rich
+#pip install playwright lxml orjson pandas pyarrow rich
 #playwright install
 #
 # Usage:
-#   python apple_fetch_to_csv.py --region IN --out out/ [--headless] [--timeout 60]
+#   python apple_fetch_to_csv.py --region IN --out out/ [--headless] [--timeout 60] [--csv]
 #
-# Outputs:
-#   out/mac_lineup_current_<YYYY-MM-DD>.csv
-#   out/ipads_india_specs_<YYYY-MM-DD>.csv
+# Outputs (Feather, zstd-compressed; --csv also writes a .csv next to each):
+#   out/mac_lineup_current_<YYYY-MM-DD>.feather
+#   out/ipads_india_specs_<YYYY-MM-DD>.feather
 
 from __future__ import annotations
 
 import argparse
-import json
+import asyncio
 import os
 import re
-import time
-from dataclasses import dataclass, asdict
 from datetime import date
+from functools import lru_cache
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Tuple
 
+import orjson
 import pandas as pd
-from bs4 import BeautifulSoup
-from playwright.sync_api import sync_playwright
+import pyarrow.feather as feather
+from lxml import etree
+from lxml import html as lxml_html
+from playwright.async_api import TimeoutError as PlaywrightTimeoutError, async_playwright
 
 # ------------------------------------------------------------
 # Config
@@ -71,32 +73,57 @@ URLS = {
     },
 }
 
+# Resources the scrapers never read; aborting them keeps page loads light
+BLOCKED_RESOURCE_TYPES = {"image", "font", "stylesheet", "media"}
+# Only these can carry the compare-grid JSON we capture
+CAPTURE_RESOURCE_TYPES = {"xhr", "fetch"}
+# URLs worth reading a JSON body from (compare data only; buy pages are read as HTML)
+CAPTURE_URL_RE = re.compile(r"compare|models|grid|spec", re.I)
+# Smaller JSON bodies are beacons, never the compare grid
+MIN_PAYLOAD_BYTES = 1024
+# Buy-page HTML loads by URL (the region is part of the URL), shared by both
+# scrapers; holding the task lets a concurrent caller await an in-flight load
+BUY_HTML_CACHE: Dict[str, "asyncio.Task[str]"] = {}
+# Any of these means the compare grid / buy-page prices have rendered
+READY_SELECTOR = "[data-analytics-section-engagement], .rf-compare, .rc-prices-fromprice"
+# Top-level keys of the compare payload shapes map_compare_payload understands
+COMPARE_PAYLOAD_KEYS = {"sections", "grid", "models", "columns"}
+# Upper bound for the post-load waits (ready selector, first compare payload)
+SETTLE_TIMEOUT_S = 5
+
 TOKEN_RE = re.compile(r"\{([A-Z0-9_]+)\}\*?")
 NUM_RE = re.compile(r"\b(\d+(?:\.\d+)?)\b")
 INCH_RE = re.compile(r"(\d+(?:\.\d+)?)\s*(?:[\"”]|-?inch|\s?in)\b", re.I)
+WS_RE = re.compile(r"\s+")
+FOOTNOTE_RE = re.compile(r"\^\{?\d+\}?|\*+$")
+DIGIT_ONLY_RE = re.compile(r"\d{1,2}")
+CHIP_IPAD_RE = re.compile(r"\b(M\d+(?:\s?(Pro|Max))?|A\d+\s?Pro|A\d+)\b")
+CHIP_MAC_RE = re.compile(r"\b(M\d+(?:\s?(Pro|Max|Ultra))?)\b")
+HOURS_RE = re.compile(r"(\d+)\s*hours?")
+GB_RE = re.compile(r"(\d{2,5})\s*gb")
+UP_TO_RE = re.compile(r"up to\s*(\d{3,5})\s*gb")
+KG_RE = re.compile(r"(\d+(?:\.\d+)?)\s*kg")
+CURRENCY_RE = re.compile(r"(₹|\$|€|£)\s?(\d+(?:\.\d+)?)")
+FROM_PRICE_RE = re.compile(r"(?:From|Starting at)\s*(₹|\$|€|£)\s?(\d{2,7}(?:\.\d{1,2})?)", re.I)
+INR_AMOUNT_RE = re.compile(r"₹\s?(\d{2,7}(?:\.\d+)?)")
+# str.translate table dropping thousands separators ("₹1,29,900" -> "₹129900")
+NO_COMMA = str.maketrans("", "", ",")
+# NBSP -> space; non-breaking hyphen / en dash / em dash -> "-"
+CLEAN_TABLE = str.maketrans({"\u00a0": " ", "\u2011": "-", "\u2013": "-", "\u2014": "-"})
+# text nodes outside <script>/<style>, i.e. what get_text(" ") used to return
+PAGE_TEXT_XPATH = etree.XPath("//text()[not(ancestor::script or ancestor::style)]")
 
 # ------------------------------------------------------------
 # Data models
 # ------------------------------------------------------------
 
-@dataclass
-class ProductRow:
-    name: str
-    category: str
-    url: Optional[str]
-    chip: Optional[str]
-    ram_gb: Optional[float]
-    storage_gb: Optional[float]
-    storage_tb: Optional[float]
-    battery_hours: Optional[float]
-    weight_kg: Optional[float]
-    price_inr: Optional[float]
-    ports: Optional[str]
-    display_inches: Optional[float]
-    notes: Optional[str]
-    learning_hours: Optional[float]
-    maintenance_hours_per_year: Optional[float]
-    power_adequacy_score: Optional[float]
+# Output schema: the parse_*_compare_grid row dicts carry these keys, and the
+# CSVs are written in this column order
+COLUMNS = [
+    "name","category","url","chip","ram_gb","storage_gb","storage_tb","battery_hours",
+    "weight_kg","price_inr","ports","display_inches","notes","learning_hours",
+    "maintenance_hours_per_year","power_adequacy_score"
+]
 
 # ------------------------------------------------------------
 # Utilities
@@ -105,22 +132,43 @@ class ProductRow:
 def ensure_dir(p: Path):
     p.mkdir(parents=True, exist_ok=True)
 
+def write_table(df: pd.DataFrame, out_dir: Path, stem: str, csv: bool = False) -> List[Path]:
+    """
+    Write df to out_dir/<stem>.feather, plus <stem>.csv when csv is set.
+    """
+    ensure_dir(out_dir)
+    feather_path = out_dir / f"{stem}.feather"
+    feather.write_feather(df, feather_path, compression="zstd")
+    paths = [feather_path]
+    if csv:
+        csv_path = out_dir / f"{stem}.csv"
+        df.to_csv(csv_path, index=False)
+        paths.append(csv_path)
+    return paths
+
 def clean_text(s: Optional[str]) -> str:
     if not s:
         return ""
-    s = re.sub(r"\s+", " ", s).strip()
-    s = s.replace("—", "-").replace("\u00a0", " ")
+    s = WS_RE.sub(" ", s.translate(CLEAN_TABLE)).strip()
     # remove footnote markers / trailing asterisks
-    s = re.sub(r"\^\{?\d+\}?|\*+$", "", s).strip()
+    s = FOOTNOTE_RE.sub("", s).strip()
     # discard footnote-only fragments
-    if re.fullmatch(r"\d{1,2}", s):
+    if DIGIT_ONLY_RE.fullmatch(s):
         return ""
     return s
 
+def page_text(page_html: str) -> str:
+    """
+    Flatten a full HTML page to cleaned, space-joined text (lxml, no soup tree).
+    """
+    if not page_html:
+        return ""
+    return clean_text(" ".join(PAGE_TEXT_XPATH(lxml_html.fromstring(page_html))))
+
+@lru_cache(maxsize=1024)
 def normalize_label(s: str) -> str:
-    s = (s or "").lower().strip()
-    s = s.replace("\u2011", "-").replace("\u2013", "-").replace("\u2014", "-")
-    s = re.sub(r"\s+", " ", s)
+    s = (s or "").translate(CLEAN_TABLE).lower().strip()
+    s = WS_RE.sub(" ", s)
     return s
 
 def parse_currency_amount(text: str) -> Tuple[Optional[str], Optional[str], Optional[float]]:
@@ -129,7 +177,7 @@ def parse_currency_amount(text: str) -> Tuple[Optional[str], Optional[str], Opti
     "From ₹89,900", "Starting at $999", "₹ 1,29,900"
     """
     t = text.replace(",", "").strip()
-    m = re.search(r"(₹|\$|€|£)\s?(\d+(?:\.\d+)?)", t)
+    m = CURRENCY_RE.search(t)
     symbol = None
     amount = None
     code = None
@@ -153,7 +201,7 @@ def to_inches(text: str) -> Optional[float]:
 
 def to_float_kg(text: str) -> Optional[float]:
     t = (text or "").lower()
-    m = re.search(r"(\d+(?:\.\d+)?)\s*kg", t)
+    m = KG_RE.search(t)
     return float(m.group(1)) if m else None
 
 def extract_token(text: str) -> Optional[str]:
@@ -167,10 +215,10 @@ def set_region_defaults(region: str) -> Tuple[Optional[str], Optional[str]]:
 # Browser helpers
 # ------------------------------------------------------------
 
-def launch_browser(headless: bool):
-    p = sync_playwright().start()
-    browser = p.chromium.launch(headless=headless)
-    context = browser.new_context(
+async def launch_browser(headless: bool):
+    p = await async_playwright().start()
+    browser = await p.chromium.launch(headless=headless)
+    context = await browser.new_context(
         user_agent=(
             "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
             "AppleWebKit/537.36 (KHTML, like Gecko) "
@@ -179,33 +227,118 @@ def launch_browser(headless: bool):
         viewport={"width": 1440, "height": 900},
         locale="en-IN",
     )
-    page = context.new_page()
-    return p, browser, context, page
+    await context.route("**/*", block_heavy_resources)
+    return p, browser, context
+
+async def block_heavy_resources(route):
+    if route.request.resource_type in BLOCKED_RESOURCE_TYPES:
+        await route.abort()
+    else:
+        await route.continue_()
 
-def goto_and_capture(page, url: str, timeout: int = 60) -> Tuple[str, List[Tuple[str, Any]]]:
+async def goto_and_capture(page, url: str, timeout: int = 60, expect_payload: bool = False,
+                           capture: bool = True) -> Tuple[str, List[Tuple[str, Any]]]:
+    """
+    Load `url` and return (rendered HTML, captured JSON payloads). With
+    capture=False no response listener is registered (buy pages only need
+    the HTML) and the payload list stays empty.
+    """
     captured: List[Tuple[str, Any]] = []
+    got_payload = asyncio.Event()
 
-    def on_response(resp):
+    async def on_response(resp):
+        if resp.request.resource_type not in CAPTURE_RESOURCE_TYPES:
+            return
         try:
-            ct = (resp.headers or {}).get("content-type", "")
-            if "json" in ct:
-                if any(k in resp.url.lower() for k in ["compare", "ipad", "mac", "models", "grid", "data", "spec"]):
-                    captured.append((resp.url, resp.json()))
+            headers = resp.headers or {}
+            if "json" not in headers.get("content-type", "") or not CAPTURE_URL_RE.search(resp.url):
+                return
+            # Beacons/analytics are tiny; only trust the header when it is present
+            size = headers.get("content-length")
+            if size is not None and int(size) < MIN_PAYLOAD_BYTES:
+                return
+            try:
+                payload = orjson.loads(await resp.body())
+            except orjson.JSONDecodeError:
+                # orjson is strict (e.g. NaN); Playwright's decoder is not
+                payload = await resp.json()
+            captured.append((resp.url, payload))
+            if is_compare_payload(payload):
+                got_payload.set()
         except Exception:
             pass
 
-    page.on("response", on_response)
+    if capture:
+        page.on("response", on_response)
     page.set_default_timeout(timeout * 1000)
-    page.goto(url, wait_until="networkidle")
-    # allow lazy scripts
-    time.sleep(1.0)
-    html = page.content()
+    await page.goto(url, wait_until="domcontentloaded")
+    try:
+        await page.wait_for_selector(READY_SELECTOR, timeout=SETTLE_TIMEOUT_S * 1000)
+    except PlaywrightTimeoutError:
+        pass
+    if expect_payload:
+        # compare pages: wait for the grid JSON rather than for network idle
+        try:
+            await asyncio.wait_for(got_payload.wait(), timeout=SETTLE_TIMEOUT_S)
+        except asyncio.TimeoutError:
+            pass
+    html = await page.content()
     return html, captured
 
+async def load_buy_html(context, url: str, timeout: int = 60) -> str:
+    page = await context.new_page()
+    try:
+        html, _ = await goto_and_capture(page, url, timeout=timeout, capture=False)
+    finally:
+        await page.close()
+    return html
+
+async def fetch_buy_html(context, url: str, timeout: int = 60) -> str:
+    """
+    Buy-page HTML, loaded in its own tab at most once per process. Concurrent
+    callers for the same URL share the in-flight load; a failed load is
+    dropped from the cache so a later call can retry.
+    """
+    task = BUY_HTML_CACHE.get(url)
+    if task is None:
+        task = asyncio.ensure_future(load_buy_html(context, url, timeout=timeout))
+        BUY_HTML_CACHE[url] = task
+    try:
+        return await task
+    except Exception:
+        if BUY_HTML_CACHE.get(url) is task:
+            del BUY_HTML_CACHE[url]
+        raise
+
+async def fetch_buy_pages(context, urls: Dict[str, str], timeout: int = 60) -> Dict[str, str]:
+    """
+    Load several buy pages concurrently and return {key: html}.
+    """
+    htmls = await asyncio.gather(*[fetch_buy_html(context, url, timeout=timeout) for url in urls.values()])
+    return dict(zip(urls, htmls))
+
 # ------------------------------------------------------------
 # Compare-page mappers (Shape A / Shape B)
 # ------------------------------------------------------------
 
+def flatten_text(v: Any) -> str:
+    """
+    Space-join the strings inside a (possibly nested) list/dict payload cell.
+    """
+    if isinstance(v, str):
+        return v
+    if isinstance(v, list):
+        return " ".join(flatten_text(x) for x in v)
+    if isinstance(v, dict):
+        return " ".join(flatten_text(x) for x in v.values())
+    return "" if v is None else str(v)
+
+def is_compare_payload(payload: Any) -> bool:
+    """
+    Cheap shape check before the full map_compare_payload walk.
+    """
+    return isinstance(payload, dict) and not COMPARE_PAYLOAD_KEYS.isdisjoint(payload)
+
 def map_compare_payload(payload: Any) -> Dict[str, Dict[int, str]]:
     """
     Normalize payload to {row_label: {col_index: cell_text}}
@@ -221,7 +354,7 @@ def map_compare_payload(payload: Any) -> Dict[str, Dict[int, str]]:
                     vals = row.get("cells") or row.get("values") or []
                     if not label or not isinstance(vals, list):
                         continue
-                    grid[label] = {i: clean_text(v if isinstance(v, str) else json.dumps(v, ensure_ascii=False))
+                    grid[label] = {i: clean_text(flatten_text(v))
                                    for i, v in enumerate(vals)}
             return grid
         # Shape B
@@ -231,7 +364,7 @@ def map_compare_payload(payload: Any) -> Dict[str, Dict[int, str]]:
                 vals = r.get("values") or r.get("cells") or []
                 if not label or not isinstance(vals, list):
                     continue
-                grid[label] = {i: clean_text(v if isinstance(v, str) else json.dumps(v, ensure_ascii=False))
+                grid[label] = {i: clean_text(flatten_text(v))
                                for i, v in enumerate(vals)}
             return grid
     except Exception:
@@ -274,26 +407,49 @@ def parse_ipad_compare_grid(grid: Dict[str, Dict[int, str]], names: List[str], r
     """
     # Common labels we care about (case-insensitive match)
     keys = {normalize_label(k): k for k in grid.keys()}
+    # Classify each label once (a label may land in several buckets)
+    buckets: Dict[str, List[str]] = {
+        "display": [], "chip": [], "battery": [], "weight": [], "storage": [], "price": [],
+    }
+    for label_norm, orig in keys.items():
+        if label_norm.startswith("display"):
+            buckets["display"].append(orig)
+        if "processor" in label_norm or "chip" in label_norm:
+            buckets["chip"].append(orig)
+        if "battery" in label_norm or "power" in label_norm:
+            buckets["battery"].append(orig)
+        if "weight" in label_norm:
+            buckets["weight"].append(orig)
+        if "storage" in label_norm or "capacity" in label_norm:
+            buckets["storage"].append(orig)
+        if label_norm == "price":
+            buckets["price"].append(orig)
+
     out: List[Dict[str, Any]] = []
     for idx, name in enumerate(names):
         row: Dict[str, Any] = {
             "name": name,
             "category": "ipad",
+            "url": None,
             "chip": None,
+            "ram_gb": None,
             "storage_gb": None,
             "storage_tb": None,
             "battery_hours": None,
             "weight_kg": None,
+            "price_inr": None,
             "ports": None,
             "display_inches": None,
-            "price_inr": None,
-            "price_tokens": {},
             "notes": "",
+            "learning_hours": None,
+            "maintenance_hours_per_year": None,
+            "power_adequacy_score": None,
+            "price_tokens": {},  # not a CSV column; dropped when the frame is built
         }
 
         # Display size & panel
-        for label_norm, orig in keys.items():
-            if label_norm.startswith("display") and idx in grid[orig]:
+        for orig in buckets["display"]:
+            if idx in grid[orig]:
                 text = grid[orig][idx]
                 inc = to_inches(text)
                 if inc and not row["display_inches"]:
@@ -301,49 +457,45 @@ def parse_ipad_compare_grid(grid: Dict[str, Dict[int, str]], names: List[str], r
                 if "thunderbolt" in text.lower():
                     row["ports"] = "USB-C (Thunderbolt/USB 4)"
         # Chip
-        for label_norm, orig in keys.items():
-            if "processor" in label_norm or "chip" in label_norm:
-                val = grid[orig].get(idx, "")
-                m = re.search(r"\b(M\d+(?:\s?(Pro|Max))?|A\d+\s?Pro|A\d+)\b", val)
-                if m:
-                    row["chip"] = m.group(0).replace("  ", " ")
+        for orig in buckets["chip"]:
+            val = grid[orig].get(idx, "")
+            m = CHIP_IPAD_RE.search(val)
+            if m:
+                row["chip"] = m.group(0).replace("  ", " ")
 
         # Battery (hours — Apple usually quotes “up to 10 hours”)
-        for label_norm, orig in keys.items():
-            if "battery" in label_norm or "power" in label_norm:
-                val = grid[orig].get(idx, "")
-                hr = re.search(r"(\d+)\s*hours?", val.lower())
-                if hr:
-                    row["battery_hours"] = float(hr.group(1))
+        for orig in buckets["battery"]:
+            val = grid[orig].get(idx, "")
+            hr = HOURS_RE.search(val.lower())
+            if hr:
+                row["battery_hours"] = float(hr.group(1))
 
         # Weight (Wi-Fi model)
-        for label_norm, orig in keys.items():
-            if "weight" in label_norm:
-                val = grid[orig].get(idx, "")
-                kg = to_float_kg(val)
-                if kg:
-                    row["weight_kg"] = kg
+        for orig in buckets["weight"]:
+            val = grid[orig].get(idx, "")
+            kg = to_float_kg(val)
+            if kg:
+                row["weight_kg"] = kg
 
         # Storage (parse options; record min/max)
-        for label_norm, orig in keys.items():
-            if "storage" in label_norm or "capacity" in label_norm:
-                val = grid[orig].get(idx, "")
-                # canonical list like "128GB, 256GB, 512GB, 1TB, 2TB"
-                t = val.lower().replace("tb", "000gb")
-                caps = [int(x) for x in re.findall(r"(\d{2,5})\s*gb", t)]
-                if caps:
-                    row["storage_gb"] = min(caps)
-                    row["storage_tb"] = (max(caps) / 1000.0)
-                else:
-                    up = re.search(r"up to\s*(\d{3,5})\s*gb", t)
-                    if up:
-                        row["storage_tb"] = float(up.group(1)) / 1000.0
+        for orig in buckets["storage"]:
+            val = grid[orig].get(idx, "")
+            # canonical list like "128GB, 256GB, 512GB, 1TB, 2TB"
+            t = val.lower().replace("tb", "000gb")
+            caps = [int(x) for x in GB_RE.findall(t)]
+            if caps:
+                row["storage_gb"] = min(caps)
+                row["storage_tb"] = (max(caps) / 1000.0)
+            else:
+                up = UP_TO_RE.search(t)
+                if up:
+                    row["storage_tb"] = float(up.group(1)) / 1000.0
 
         # Price tokens or price text
         # Sometimes the compare grid has a "Price" row that contains:
         #   "Wi-Fi {TOKEN}*  Wi-Fi + Cellular {TOKEN}*"
-        for label_norm, orig in keys.items():
-            if label_norm == "price" and idx in grid[orig]:
+        for orig in buckets["price"]:
+            if idx in grid[orig]:
                 cell = grid[orig][idx]
                 # Try numeric first
                 _, _, amt = parse_currency_amount(cell)
@@ -352,9 +504,10 @@ def parse_ipad_compare_grid(grid: Dict[str, Dict[int, str]], names: List[str], r
                     row["price_inr"] = amt
                 # Extract tokens when present
                 tokens = {}
+                cell_l = cell.lower()
                 for m in TOKEN_RE.finditer(cell):
-                    window = cell[max(0, m.start()-40): m.end()+40].lower()
-                    if "wi-fi + cellular" in window or "wifi + cellular" in window or "cellular" in window:
+                    # "cellular" also covers the "wi-fi + cellular" / "wifi + cellular" spellings
+                    if "cellular" in cell_l[max(0, m.start()-40): m.end()+40]:
                         tokens["cellular"] = m.group(1)
                     else:
                         tokens["wifi"] = m.group(1)
@@ -368,69 +521,86 @@ def parse_mac_compare_grid(grid: Dict[str, Dict[int, str]], names: List[str], re
     Extracts a handful of consistent Mac fields from a normalized compare grid.
     """
     keys = {normalize_label(k): k for k in grid.keys()}
+    # Classify each label once (a label may land in several buckets)
+    buckets: Dict[str, List[str]] = {
+        "display": [], "chip": [], "battery": [], "weight": [], "ports": [], "storage": [],
+    }
+    for label_norm, orig in keys.items():
+        if "display" in label_norm:
+            buckets["display"].append(orig)
+        if "processor" in label_norm or "chip" in label_norm:
+            buckets["chip"].append(orig)
+        if "battery" in label_norm or "power" in label_norm:
+            buckets["battery"].append(orig)
+        if "weight" in label_norm:
+            buckets["weight"].append(orig)
+        if "ports" in label_norm or "connector" in label_norm:
+            buckets["ports"].append(orig)
+        if "storage" in label_norm:
+            buckets["storage"].append(orig)
+
     out: List[Dict[str, Any]] = []
 
     for idx, name in enumerate(names):
         row: Dict[str, Any] = {
             "name": name,
             "category": "macbook" if "macbook" in name.lower() else "mac",
+            "url": None,
             "chip": None,
             "ram_gb": None,
             "storage_gb": None,
             "storage_tb": None,
             "battery_hours": None,
             "weight_kg": None,
+            "price_inr": None,
             "ports": None,
             "display_inches": None,
-            "price_inr": None,
             "notes": "",
+            "learning_hours": None,
+            "maintenance_hours_per_year": None,
+            "power_adequacy_score": None,
         }
 
         # Display inches (for Mac notebooks / iMac)
-        for label_norm, orig in keys.items():
-            if "display" in label_norm and idx in grid[orig]:
+        for orig in buckets["display"]:
+            if idx in grid[orig]:
                 inc = to_inches(grid[orig][idx])
                 if inc:
                     row["display_inches"] = inc
 
         # Chip
-        for label_norm, orig in keys.items():
-            if "processor" in label_norm or "chip" in label_norm:
-                val = grid[orig].get(idx, "")
-                m = re.search(r"\b(M\d+(?:\s?(Pro|Max|Ultra))?)\b", val)
-                if m:
-                    row["chip"] = m.group(1).replace("  ", " ")
+        for orig in buckets["chip"]:
+            val = grid[orig].get(idx, "")
+            m = CHIP_MAC_RE.search(val)
+            if m:
+                row["chip"] = m.group(1).replace("  ", " ")
 
         # Battery (not for desktops)
-        for label_norm, orig in keys.items():
-            if "battery" in label_norm or "power" in label_norm:
-                val = grid[orig].get(idx, "")
-                hr = re.search(r"(\d+)\s*hours?", val.lower())
-                if hr:
-                    row["battery_hours"] = float(hr.group(1))
+        for orig in buckets["battery"]:
+            val = grid[orig].get(idx, "")
+            hr = HOURS_RE.search(val.lower())
+            if hr:
+                row["battery_hours"] = float(hr.group(1))
 
         # Weight (notebooks)
-        for label_norm, orig in keys.items():
-            if "weight" in label_norm:
-                kg = to_float_kg(grid[orig].get(idx, ""))
-                if kg:
-                    row["weight_kg"] = kg
+        for orig in buckets["weight"]:
+            kg = to_float_kg(grid[orig].get(idx, ""))
+            if kg:
+                row["weight_kg"] = kg
 
         # Ports — if present as text
-        for label_norm, orig in keys.items():
-            if "ports" in label_norm or "connector" in label_norm:
-                txt = grid[orig].get(idx, "")
-                if txt:
-                    row["ports"] = txt
+        for orig in buckets["ports"]:
+            txt = grid[orig].get(idx, "")
+            if txt:
+                row["ports"] = txt
 
         # Storage (options)
-        for label_norm, orig in keys.items():
-            if "storage" in label_norm:
-                t = grid[orig].get(idx, "").lower().replace("tb", "000gb")
-                caps = [int(x) for x in re.findall(r"(\d{2,5})\s*gb", t)]
-                if caps:
-                    row["storage_gb"] = min(caps)
-                    row["storage_tb"] = (max(caps) / 1000.0)
+        for orig in buckets["storage"]:
+            t = grid[orig].get(idx, "").lower().replace("tb", "000gb")
+            caps = [int(x) for x in GB_RE.findall(t)]
+            if caps:
+                row["storage_gb"] = min(caps)
+                row["storage_tb"] = (max(caps) / 1000.0)
 
         out.append(row)
     return out
@@ -443,13 +613,18 @@ def get_from_price_inr(page_html: str, region: str) -> Optional[float]:
     """
     Parse the first plausible "From ₹..." (or currency) amount on a buy page.
     """
-    soup = BeautifulSoup(page_html, "lxml")
-    text = clean_text(soup.get_text(" ", strip=True))
+    return get_from_price_inr_text(page_text(page_html).translate(NO_COMMA), region)
+
+def get_from_price_inr_text(text: str, region: str) -> Optional[float]:
+    """
+    Same as get_from_price_inr, for comma-free page text
+    (page_text(html).translate(NO_COMMA)).
+    """
     # Prefer occurrences near "From" or "Starting at"
-    near = re.findall(r"(?:From|Starting at)\s*(₹|\$|€|£)\s?(\d{2,7}(?:\.\d{1,2})?)", text, flags=re.I)
+    near = FROM_PRICE_RE.findall(text)
     if near:
         sym, amt = near[0]
-        amt = float(amt.replace(",", ""))
+        amt = float(amt)
         if region.upper() == "IN" and sym == "₹":
             return amt
 
@@ -459,249 +634,208 @@ def get_from_price_inr(page_html: str, region: str) -> Optional[float]:
         return amt
     return None
 
-def fetch_buy_page_price(page, url: str, timeout: int = 60) -> Optional[float]:
-    html, _ = goto_and_capture(page, url, timeout=timeout)
+def inr_amounts(text: str) -> List[float]:
+    """
+    Distinct ₹ amounts in comma-free page text, ascending.
+    """
+    return sorted({float(x) for x in INR_AMOUNT_RE.findall(text)})
+
+async def fetch_buy_page_price(page, url: str, timeout: int = 60) -> Optional[float]:
+    html, _ = await goto_and_capture(page, url, timeout=timeout, capture=False)
     return get_from_price_inr(html, region="IN")
 
 # ------------------------------------------------------------
 # Top-level runners
 # ------------------------------------------------------------
 
-def scrape_ipads(region: str, out_dir: Path, headless: bool, timeout: int) -> Path:
-    p, browser, context, page = launch_browser(headless=headless)
-
+async def scrape_ipads(context, region: str, out_dir: Path, timeout: int, csv: bool = False) -> List[Path]:
+    compare_url = URLS["ipad_compare"].format(region=region.lower())
+    # Prices: buy pages (per-family). We map by simple heuristics:
+    buy_urls = {
+        "pro": URLS["buy_pages"]["ipad-pro"].format(region=region.lower()),
+        "air": URLS["buy_pages"]["ipad-air"].format(region=region.lower()),
+        "ipad": URLS["buy_pages"]["ipad"].format(region=region.lower()),
+        "mini": URLS["buy_pages"]["ipad-mini"].format(region=region.lower()),
+    }
+    # Compare page and buy pages (each fetched only once) load concurrently
+    page = await context.new_page()
     try:
-        compare_url = URLS["ipad_compare"].format(region=region.lower())
-        html, payloads = goto_and_capture(page, compare_url, timeout=timeout)
-
-        # Prefer payloads
-        grid = {}
-        names = []
-        for _, pl in payloads:
-            grid = map_compare_payload(pl)
-            if grid:
-                names = extract_model_names_from_payload(pl)
-                if names:
-                    break
-
-        if not grid:
-            # DOM fallback
-            soup = BeautifulSoup(html, "lxml")
-            # Very light fallback: extract all text blocks; this is a last resort.
-            # (Most of the time the payload exists.)
-            # We won't implement a complex DOM grid walker here since payloads are common.
-            pass
-
-        # If names missing, derive rough column count from a long row
-        if not names and grid:
-            # pick the longest row
-            longest = max(grid.values(), key=lambda d: len(d)) if grid else {}
-            col_count = len(longest)
-            names = [f"Model {i+1}" for i in range(col_count)]
-
-        rows = parse_ipad_compare_grid(grid, names, region=region)
-
-        # Prices: buy pages (per-family). We map by simple heuristics:
-        buy_urls = {
-            "pro": URLS["buy_pages"]["ipad-pro"].format(region=region.lower()),
-            "air": URLS["buy_pages"]["ipad-air"].format(region=region.lower()),
-            "ipad": URLS["buy_pages"]["ipad"].format(region=region.lower()),
-            "mini": URLS["buy_pages"]["ipad-mini"].format(region=region.lower()),
-        }
-        # Fetch each only once
-        buy_html_cache: Dict[str, str] = {}
-        for family, url in buy_urls.items():
-            h, _ = goto_and_capture(page, url, timeout=timeout)
-            buy_html_cache[family] = h
-
-        for r in rows:
-            nm = r["name"].lower()
-            family = None
-            if "pro" in nm:
-                family = "pro"
-            elif "air" in nm:
-                family = "air"
-            elif "mini" in nm:
-                family = "mini"
-            else:
-                family = "ipad"
-
-            price = get_from_price_inr(buy_html_cache.get(family, ""), region)
-            # Heuristic: if the page contains multiple "From" prices (11 vs 13"),
-            # choose the smaller for 11", larger for 13" based on detected inches.
-            if family in {"pro", "air"} and buy_html_cache.get(family):
-                # collect all INR amounts on the page
-                text = clean_text(BeautifulSoup(buy_html_cache[family], "lxml").get_text(" ", strip=True))
-                amts = [float(a.replace(",", "")) for _, a in re.findall(r"(₹)\s?(\d{2,7}(?:\.\d{1,2})?)", text)]
-                amts = sorted(set(amts))
-                if amts:
-                    if r.get("display_inches") and r["display_inches"] >= 12.8:
-                        price = max(amts)  # 13"
-                    else:
-                        price = min(amts)  # 11"
-            r["price_inr"] = price
-
-            # Normalize ports for Pro
-            if not r["ports"] and "pro" in nm:
-                r["ports"] = "USB-C (Thunderbolt/USB 4)"
-            elif not r["ports"]:
-                r["ports"] = "USB-C"
-
-        # Minimal shaping to your requested schema
-        out_rows: List[ProductRow] = []
-        for r in rows:
-            out_rows.append(ProductRow(
-                name=r["name"],
-                category="ipad",
-                url=None,
-                chip=r.get("chip"),
-                ram_gb=None,
-                storage_gb=r.get("storage_gb"),
-                storage_tb=r.get("storage_tb"),
-                battery_hours=r.get("battery_hours") or 10.0,
-                weight_kg=r.get("weight_kg"),
-                price_inr=r.get("price_inr"),
-                ports=r.get("ports"),
-                display_inches=r.get("display_inches"),
-                notes=r.get("notes"),
-                learning_hours=None,
-                maintenance_hours_per_year=None,
-                power_adequacy_score=None,
-            ))
-
-        df = pd.DataFrame([asdict(x) for x in out_rows], columns=[
-            "name","category","url","chip","ram_gb","storage_gb","storage_tb","battery_hours",
-            "weight_kg","price_inr","ports","display_inches","notes","learning_hours",
-            "maintenance_hours_per_year","power_adequacy_score"
-        ])
-        ensure_dir(out_dir)
-        csv_path = out_dir / f"ipads_india_specs_{date.today().isoformat()}.csv"
-        df.to_csv(csv_path, index=False)
-        return csv_path
+        (html, payloads), buy_html_cache = await asyncio.gather(
+            goto_and_capture(page, compare_url, timeout=timeout, expect_payload=True),
+            fetch_buy_pages(context, buy_urls, timeout=timeout),
+        )
     finally:
-        context.close()
-        browser.close()
-        p.stop()
-
-def scrape_macs(region: str, out_dir: Path, headless: bool, timeout: int) -> Path:
-    p, browser, context, page = launch_browser(headless=headless)
+        await page.close()
+
+    # Prefer payloads
+    grid = {}
+    names = []
+    for _, pl in payloads:
+        if not is_compare_payload(pl):
+            continue
+        grid = map_compare_payload(pl)
+        if grid:
+            names = extract_model_names_from_payload(pl)
+            if names:
+                break
+
+    # No DOM fallback: the compare payload is almost always present. A future
+    # grid walker for `html` should parse it with lxml_html.fromstring directly.
+
+    # If names missing, derive rough column count from a long row
+    if not names and grid:
+        # length of the longest row
+        col_count = max((len(d) for d in grid.values()), default=0)
+        names = [f"Model {i+1}" for i in range(col_count)]
+
+    rows = parse_ipad_compare_grid(grid, names, region=region)
+
+    # Flatten each page and collect its INR amounts once, not once per row
+    buy_text_cache: Dict[str, str] = {
+        f: page_text(h).translate(NO_COMMA) for f, h in buy_html_cache.items()
+    }
+    buy_price_cache: Dict[str, Optional[float]] = {
+        f: get_from_price_inr_text(t, region) for f, t in buy_text_cache.items()
+    }
+    buy_amts_cache: Dict[str, List[float]] = {f: inr_amounts(t) for f, t in buy_text_cache.items()}
+
+    for r in rows:
+        nm = r["name"].lower()
+        family = None
+        if "pro" in nm:
+            family = "pro"
+        elif "air" in nm:
+            family = "air"
+        elif "mini" in nm:
+            family = "mini"
+        else:
+            family = "ipad"
+
+        price = buy_price_cache.get(family)
+        # Heuristic: if the page contains multiple "From" prices (11 vs 13"),
+        # choose the smaller for 11", larger for 13" based on detected inches.
+        if family in {"pro", "air"}:
+            amts = buy_amts_cache.get(family)
+            if amts:
+                if r.get("display_inches") and r["display_inches"] >= 12.8:
+                    price = max(amts)  # 13"
+                else:
+                    price = min(amts)  # 11"
+        r["price_inr"] = price
+
+        # Normalize ports for Pro
+        if not r["ports"] and "pro" in nm:
+            r["ports"] = "USB-C (Thunderbolt/USB 4)"
+        elif not r["ports"]:
+            r["ports"] = "USB-C"
+
+        r["battery_hours"] = r["battery_hours"] or 10.0
+
+    df = pd.DataFrame(rows, columns=COLUMNS)
+    return write_table(df, out_dir, f"ipads_india_specs_{date.today().isoformat()}", csv=csv)
+
+async def scrape_macs(context, region: str, out_dir: Path, timeout: int, csv: bool = False) -> List[Path]:
+    compare_url = URLS["mac_compare"].format(region=region.lower())
+    # Buy pages for prices: the subset required for mapping names
+    need_pages = ["macbook-air", "macbook-pro", "imac", "mac-mini", "mac-studio", "mac-pro"]
+    buy_urls = {k: URLS["buy_pages"][k].format(region=region.lower()) for k in need_pages}
+    page = await context.new_page()
     try:
-        compare_url = URLS["mac_compare"].format(region=region.lower())
-        html, payloads = goto_and_capture(page, compare_url, timeout=timeout)
-
-        grid = {}
-        names = []
-        for _, pl in payloads:
-            grid = map_compare_payload(pl)
-            if grid:
-                names = extract_model_names_from_payload(pl)
-                if names:
-                    break
-
-        if not names and grid:
-            longest = max(grid.values(), key=lambda d: len(d)) if grid else {}
-            names = [f"Model {i+1}" for i in range(len(longest))]
-
-        rows = parse_mac_compare_grid(grid, names, region=region)
-
-        # Buy pages for prices
-        buy_urls = {k: v.format(region=region.lower()) for k, v in URLS["buy_pages"].items()}
-        buy_cache: Dict[str, str] = {}
-        # fetch a subset required for mapping names
-        need_pages = ["macbook-air", "macbook-pro", "imac", "mac-mini", "mac-studio", "mac-pro"]
-        for key in need_pages:
-            h, _ = goto_and_capture(page, buy_urls[key], timeout=timeout)
-            buy_cache[key] = h
-
-        def price_from_family(name_lower: str) -> Optional[float]:
-            if "macbook air" in name_lower:
-                return get_from_price_inr(buy_cache["macbook-air"], region)
-            if "macbook pro" in name_lower:
-                return get_from_price_inr(buy_cache["macbook-pro"], region)
-            if "imac" in name_lower:
-                # Two-port vs four-port may have two prices; pick smaller for two-port keyword
-                text = clean_text(BeautifulSoup(buy_cache["imac"], "lxml").get_text(" ", strip=True))
-                amts = [float(a.replace(",", "")) for _, a in re.findall(r"(₹)\s?(\d{2,7}(?:\.\d{1,2})?)", text)]
-                if amts:
-                    amts = sorted(set(amts))
-                    if "two" in name_lower or "two ports" in name_lower:
-                        return min(amts)
-                    return max(amts)
-                return get_from_price_inr(buy_cache["imac"], region)
-            if "mini" in name_lower:
-                return get_from_price_inr(buy_cache["mac-mini"], region)
-            if "studio" in name_lower:
-                return get_from_price_inr(buy_cache["mac-studio"], region)
-            if "pro" in name_lower and "mac pro" in name_lower:
-                return get_from_price_inr(buy_cache["mac-pro"], region)
-            return None
-
-        out_rows: List[ProductRow] = []
-        for r in rows:
-            nm = r["name"]
-            nm_l = nm.lower()
-            price = price_from_family(nm_l)
-
-            # Ports: if compare grid didn't give, set common sensible defaults for notebooks
-            ports = r.get("ports")
-            if not ports and "macbook air" in nm_l:
-                ports = '["MagSafe 3","2x Thunderbolt 4 (USB-C)","3.5mm"]'
-            elif not ports and "macbook pro" in nm_l:
-                # M4 base often TB4; Pro/Max TB5 — we won't disambiguate here
-                ports = '["MagSafe 3","3x Thunderbolt (USB-C)","HDMI","SDXC","3.5mm"]'
-
-            out_rows.append(ProductRow(
-                name=nm,
-                category="macbook" if "macbook" in nm_l else "mac",
-                url=None,
-                chip=r.get("chip"),
-                ram_gb=None,
-                storage_gb=r.get("storage_gb"),
-                storage_tb=r.get("storage_tb"),
-                battery_hours=r.get("battery_hours"),
-                weight_kg=r.get("weight_kg"),
-                price_inr=price,
-                ports=ports,
-                display_inches=r.get("display_inches"),
-                notes=r.get("notes"),
-                learning_hours=None,
-                maintenance_hours_per_year=None,
-                power_adequacy_score=None,
-            ))
-
-        df = pd.DataFrame([asdict(x) for x in out_rows], columns=[
-            "name","category","url","chip","ram_gb","storage_gb","storage_tb","battery_hours",
-            "weight_kg","price_inr","ports","display_inches","notes","learning_hours",
-            "maintenance_hours_per_year","power_adequacy_score"
-        ])
-        ensure_dir(out_dir)
-        csv_path = out_dir / f"mac_lineup_current_{date.today().isoformat()}.csv"
-        df.to_csv(csv_path, index=False)
-        return csv_path
+        (html, payloads), buy_cache = await asyncio.gather(
+            goto_and_capture(page, compare_url, timeout=timeout, expect_payload=True),
+            fetch_buy_pages(context, buy_urls, timeout=timeout),
+        )
+    finally:
+        await page.close()
+
+    grid = {}
+    names = []
+    for _, pl in payloads:
+        if not is_compare_payload(pl):
+            continue
+        grid = map_compare_payload(pl)
+        if grid:
+            names = extract_model_names_from_payload(pl)
+            if names:
+                break
+
+    if not names and grid:
+        col_count = max((len(d) for d in grid.values()), default=0)
+        names = [f"Model {i+1}" for i in range(col_count)]
+
+    rows = parse_mac_compare_grid(grid, names, region=region)
+
+    def price_from_family(name_lower: str) -> Optional[float]:
+        if "macbook air" in name_lower:
+            return get_from_price_inr(buy_cache["macbook-air"], region)
+        if "macbook pro" in name_lower:
+            return get_from_price_inr(buy_cache["macbook-pro"], region)
+        if "imac" in name_lower:
+            # Two-port vs four-port may have two prices; pick smaller for two-port keyword
+            amts = inr_amounts(page_text(buy_cache["imac"]).translate(NO_COMMA))
+            if amts:
+                if "two" in name_lower or "two ports" in name_lower:
+                    return min(amts)
+                return max(amts)
+            return get_from_price_inr(buy_cache["imac"], region)
+        if "mini" in name_lower:
+            return get_from_price_inr(buy_cache["mac-mini"], region)
+        if "studio" in name_lower:
+            return get_from_price_inr(buy_cache["mac-studio"], region)
+        if "pro" in name_lower and "mac pro" in name_lower:
+            return get_from_price_inr(buy_cache["mac-pro"], region)
+        return None
+
+    for r in rows:
+        nm_l = r["name"].lower()
+        r["price_inr"] = price_from_family(nm_l)
+
+        # Ports: if compare grid didn't give, set common sensible defaults for notebooks
+        if not r["ports"] and "macbook air" in nm_l:
+            r["ports"] = '["MagSafe 3","2x Thunderbolt 4 (USB-C)","3.5mm"]'
+        elif not r["ports"] and "macbook pro" in nm_l:
+            # M4 base often TB4; Pro/Max TB5 — we won't disambiguate here
+            r["ports"] = '["MagSafe 3","3x Thunderbolt (USB-C)","HDMI","SDXC","3.5mm"]'
+
+    df = pd.DataFrame(rows, columns=COLUMNS)
+    return write_table(df, out_dir, f"mac_lineup_current_{date.today().isoformat()}", csv=csv)
+
+async def run_all(region: str, out_dir: Path, headless: bool, timeout: int, csv: bool = False) -> List[Path]:
+    """
+    Run both scrapers concurrently on one browser + context, launched and torn down once.
+    """
+    p, browser, context = await launch_browser(headless=headless)
+    try:
+        ipads_out, macs_out = await asyncio.gather(
+            scrape_ipads(context, region=region, out_dir=out_dir, timeout=timeout, csv=csv),
+            scrape_macs(context, region=region, out_dir=out_dir, timeout=timeout, csv=csv),
+        )
+        return ipads_out + macs_out
     finally:
-        context.close()
-        browser.close()
-        p.stop()
+        await context.close()
+        await browser.close()
+        await p.stop()
 
 # ------------------------------------------------------------
 # CLI
 # ------------------------------------------------------------
 
 def main():
-    ap = argparse.ArgumentParser(description="Fetch Apple India Mac & iPad data into CSVs via real browser scraping.")
+    ap = argparse.ArgumentParser(description="Fetch Apple India Mac & iPad data into Feather/CSV files via real browser scraping.")
     ap.add_argument("--region", default="IN", help="Region code (IN/US/UK/...). Default IN")
     ap.add_argument("--out", default="out", help="Output directory. Default out/")
     ap.add_argument("--headless", action="store_true", help="Run browser headless")
     ap.add_argument("--timeout", type=int, default=60, help="Per-page timeout in seconds (default 60)")
+    ap.add_argument("--csv", action="store_true", help="Also write CSV copies of the Feather outputs")
     args = ap.parse_args()
 
     out_dir = Path(args.out); ensure_dir(out_dir)
 
-    ipads_csv = scrape_ipads(region=args.region, out_dir=out_dir, headless=args.headless, timeout=args.timeout)
-    macs_csv  = scrape_macs(region=args.region, out_dir=out_dir, headless=args.headless, timeout=args.timeout)
+    written = asyncio.run(run_all(region=args.region, out_dir=out_dir, headless=args.headless,
+                                  timeout=args.timeout, csv=args.csv))
 
-    print(f"✅ Wrote: {ipads_csv}")
-    print(f"✅ Wrote: {macs_csv}")
+    for path in written:
+        print(f"✅ Wrote: {path}")
 
 if __name__ == "__main__":
     main()
@@ -3,30 +3,42 @@
 # - Playwright fetches BUY + Marketing pages for each iPad family
 # - Regex-based parsing first; if a field can't be parsed, we call OpenAI
 # - If an exception occurs, we ask OpenAI to summarize the error & suggest fixes
+# - LLM answers are cached for a week in .llm_cache/ (in the working directory)
 #
 # Install:
 # python -m venv .venv && source .venv/bin/activate
+# pip install playwright openai selectolax   # optional: google-re2 (faster regex)
 # playwright install
 # export OPENAI_API_KEY=sk-...
 # python ipad_fetch_to_csv.py --region IN --out out/ --headless
 
 # Usage:
 #   python llm_apple_fetch_to_csv.py --region IN --out out/ [--headless] [--timeout 60]
+#                                    [--llm-fallback {batch,parallel}]
 #
 # Output:
 #   out/ipads_india_specs_<YYYY-MM-DD>.csv
+#   .llm_cache/<sha256>.json   (one per LLM extraction; delete to force fresh answers)
 
 from __future__ import annotations
 
-import argparse, json, os, re, sys, time, traceback
+import argparse, asyncio, csv, hashlib, json, os, re, sys, time, traceback
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
 from datetime import date
+from functools import lru_cache
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import TYPE_CHECKING, Any, Dict, FrozenSet, List, Optional, Tuple
 
-import pandas as pd
-from bs4 import BeautifulSoup
-from playwright.sync_api import sync_playwright
-from openai import OpenAI
+# openai and playwright are imported where they're used, so --help and
+# argument errors don't pay for loading them
+if TYPE_CHECKING:
+    from openai import AsyncOpenAI
+
+try:
+    import re2  # optional: linear-time RE2 engine (pip install google-re2)
+except ImportError:
+    re2 = None
 
 # ---------- Config ----------
 
@@ -55,26 +67,85 @@ MKT_URLS = {
 
 CURRENCY = ("INR", "₹")  # for region=IN
 
+COLUMNS = (
+    "name", "category", "url", "chip", "ram_gb", "storage_gb", "storage_tb",
+    "battery_hours", "weight_kg", "price_inr", "ports", "display_inches",
+    "notes", "learning_hours", "maintenance_hours_per_year", "power_adequacy_score",
+)
+
+# What get_html waits for after DOMContentLoaded: a rendered price on BUY pages,
+# the main content / price list on marketing pages
+BUY_READY_SELECTOR = "text=₹"
+MKT_READY_SELECTOR = "main, [data-module-template], .rf-pdp-pricelist"
+# Upper bound for that wait; a miss isn't fatal (e.g. no ₹ outside region IN)
+SETTLE_TIMEOUT_S = 5
+
+# Requests aborted by the context route: heavy assets and analytics beacons.
+# Documents, scripts and XHR/fetch still load so the SPA content renders.
+BLOCKED_RESOURCE_TYPES = {"image", "media", "font", "stylesheet"}
+BLOCKED_URL_MARKERS = ("doubleclick", "google-analytics", "adobedtm", "demdex")
+
+MAX_CONCURRENT_PAGES = 4  # size of the tab pool, i.e. pages loading at once
+
+# Fields the LLM fallback can fill in; each request asks only for the ones the
+# regexes left empty
+WANTED_TEMPLATE = {
+    "price_inr": "From price in INR (Wi-Fi model) as a number (e.g., 99900).",
+    "weight_kg": "Wi-Fi model weight in kilograms as a number (e.g., 0.444).",
+    "display_inches": "Diagonal display size in inches as a float (e.g., 11.1).",
+    "chip": "Chip string like 'M4', 'M3', 'A16', 'A17 Pro'.",
+    "ports": "Either 'USB-C' or 'USB-C (Thunderbolt/USB 4)'.",
+    "storage_gb_min": "Base storage (smallest capacity) in GB as a number.",
+    "storage_gb_max": "Max storage in GB as a number.",
+}
+# Type each WANTED_TEMPLATE field must have in the row; LLM answers are coerced to it
+FIELD_TYPES = {
+    "price_inr": float, "weight_kg": float, "display_inches": float,
+    "chip": str, "ports": str, "storage_gb_min": int, "storage_gb_max": int,
+}
+LLM_NUMBER_RE = re.compile(r"\d[\d,]*(?:\.\d+)?")
+LLM_MODEL = "gpt-4.1-nano"         # field extraction: small structured JSON, cheapest model suffices
+EXPLAIN_MODEL = "gpt-4.1-mini"     # free-text error summaries
+LLM_MAX_OUTPUT_TOKENS = 256        # per family in a fallback request
+LLM_HTML_BUDGET = 180000  # chars of HTML per fallback request, split across its items
+LLM_SNIPPET_CHARS = 2000  # per page: tech-specs text + the text around the first ₹
+LLM_MAX_RETRIES = 4       # SDK retries (exponential backoff) on 429/5xx/timeouts
+LLM_MAX_CONCURRENCY = 3   # in-flight fallback requests in --llm-fallback parallel; keep under your RPM
+LLM_CACHE_DIR = Path(".llm_cache")  # one JSON file per extraction, named by its content hash
+LLM_CACHE_TTL_S = 7 * 86400
+# Fields whose answer depends on the family's size, not just the page it shares
+# (Pro 11/13 and Air 11/13 read the same pages)
+SIZE_DEPENDENT_FIELDS = {"price_inr", "weight_kg", "display_inches"}
+
+EXTRACT_SYS_MSG = (
+    "You are a precise HTML parser. Extract numeric values and short strings.\n"
+    "If a field is not present, return null. Use numbers only for prices/weights/sizes."
+)
+
 # ---------- OpenAI helpers (fallback + error explain) ----------
 
-def get_client() -> Optional[OpenAI]:
+@lru_cache(maxsize=1)  # one client (and connection pool) per process
+def get_client() -> Optional[AsyncOpenAI]:
     key = os.getenv("OPENAI_API_KEY")
     if not key:
         return None
-    return OpenAI()
+    from openai import AsyncOpenAI
+    return AsyncOpenAI(max_retries=LLM_MAX_RETRIES)
 
-def llm_extract_fields(client: OpenAI, html: str, wanted: Dict[str, str]) -> Dict[str, Any]:
+async def llm_extract_fields(client: AsyncOpenAI, items: List[Tuple[str, str, List[str]]]) -> Dict[str, Dict[str, Any]]:
     """
-    Ask the LLM to extract fields from messy HTML when regex fails.
-    `wanted` is a mapping: field_name -> instruction (what to extract).
-    Returns dict with best-effort parsed values.
+    Ask the LLM to extract fields from messy HTML when regex fails, for all
+    families in one request. `items` is a list of (family name, html, needed
+    field names); the field instructions come from WANTED_TEMPLATE.
+    Returns {family name: dict with best-effort values for its needed fields}.
     """
-    sys_msg = (
-        "You are a precise HTML parser. Extract numeric values and short strings.\n"
-        "If a field is not present, return null. Use numbers only for prices/weights/sizes."
-    )
+    if not items:
+        return {}
+    cap = LLM_HTML_BUDGET // len(items)
+    wanted = {k: v for k, v in WANTED_TEMPLATE.items() if any(k in needed for _, _, needed in items)}
     instructions = {
-        "task": "Extract fields from Apple iPad HTML (India). Return JSON only.",
+        "task": ("Extract fields from Apple iPad HTML (India) for each item. "
+                 "Return JSON only: an object keyed by item family, each value an object of that item's needed fields."),
         "fields": wanted,
         "notes": [
             "Prices are in INR; strip commas; return numeric price_inr.",
@@ -84,196 +155,493 @@ def llm_extract_fields(client: OpenAI, html: str, wanted: Dict[str, str]) -> Dic
             "Ports should be 'USB-C' or 'USB-C (Thunderbolt/USB 4)'.",
             "Storage: base and max in GB (e.g., 128, 2048)."
         ],
+        "items": [{"family": name, "needed": needed, "html": html[:cap]} for name, html, needed in items],
     }
-    resp = client.responses.create(
-        model="gpt-4.1-mini",
+    resp = await client.responses.create(
+        model=LLM_MODEL,
         input=[
-            {"role": "system", "content": sys_msg},
+            {"role": "system", "content": EXTRACT_SYS_MSG},
             {"role": "user", "content": json.dumps(instructions)},
-            {"role": "user", "content": html[:180000]}  # cap for safety
         ],
         temperature=0,
-        response_format={"type": "json_object"},
+        max_output_tokens=LLM_MAX_OUTPUT_TOKENS * len(items),
+        text={"format": {"type": "json_object"}},  # Responses API JSON mode
     )
     try:
-        return json.loads(resp.output_text)
+        res = json.loads(resp.output_text)
     except Exception:
         return {}
+    return {name: {k: res[name].get(k) for k in needed}
+            for name, _, needed in items if isinstance(res.get(name), dict)}
 
-def llm_explain_error(client: Optional[OpenAI], err_text: str) -> str:
+async def llm_extract_parallel(client: AsyncOpenAI, items: List[Tuple[str, str, List[str]]],
+                               failures: Optional[List[Tuple[str, str]]] = None,
+                               families: Optional[Dict[str, List[str]]] = None) -> Dict[str, Dict[str, Any]]:
+    """
+    One request per family, run concurrently (at most LLM_MAX_CONCURRENCY at once).
+    A family whose request fails keeps its regex values; the error goes to
+    `failures` (see failure_entry) so it shows up in the run's error report,
+    against every family in `families[name]` when a request answers several.
+    """
+    sem = asyncio.Semaphore(LLM_MAX_CONCURRENCY)
+
+    async def one(item: Tuple[str, str, List[str]]) -> Dict[str, Dict[str, Any]]:
+        async with sem:
+            return await llm_extract_fields(client, [item])
+
+    merged: Dict[str, Dict[str, Any]] = {}
+    results = await asyncio.gather(*[one(item) for item in items], return_exceptions=True)
+    for (name, _, _), res in zip(items, results):
+        if isinstance(res, BaseException):
+            if failures is not None:
+                failures.append(failure_entry((families or {}).get(name, [name]), res))
+            continue
+        merged.update(res)
+    return merged
+
+def coerce_llm_value(field: str, value: Any) -> Any:
+    """
+    An LLM answer as the field's FIELD_TYPES type, or None if it doesn't fit
+    (e.g. "₹59,900" -> 59900.0, "2 TB" -> 2000 for storage, "n/a" -> None).
+    """
+    kind = FIELD_TYPES[field]
+    if value is None or isinstance(value, (dict, list)):
+        return None
+    if kind is str:
+        return str(value).strip() or None
+    if isinstance(value, str):
+        m = LLM_NUMBER_RE.search(value)
+        if not m:
+            return None
+        scale = 1000 if field.startswith("storage_") and "TB" in value.upper() else 1
+        value = float(m.group(0).replace(",", "")) * scale
+    try:
+        return kind(float(value))
+    except (TypeError, ValueError, OverflowError):
+        return None
+
+def llm_cache_key(name: str, needed: List[str], html: str) -> str:
+    """
+    Content hash of one extraction. The family name is part of it only when a
+    size-dependent field is needed, so e.g. Pro 11/13 still share an answer
+    for the chip but not for the price.
+    """
+    wanted = {k: WANTED_TEMPLATE[k] for k in needed}
+    family = name if SIZE_DEPENDENT_FIELDS.intersection(needed) else None
+    return hashlib.sha256(repr((LLM_MODEL, EXTRACT_SYS_MSG, family, wanted, html[:LLM_HTML_BUDGET])).encode()).hexdigest()
+
+def llm_cache_get(key: str) -> Optional[Dict[str, Any]]:
+    path = LLM_CACHE_DIR / f"{key}.json"
+    try:
+        if time.time() - path.stat().st_mtime > LLM_CACHE_TTL_S:
+            return None
+        return json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+
+def llm_cache_put(key: str, value: Dict[str, Any]):
+    ensure_dir(LLM_CACHE_DIR)
+    tmp = LLM_CACHE_DIR / f"{key}.json.tmp"
+    tmp.write_text(json.dumps(value), encoding="utf-8")
+    os.replace(tmp, LLM_CACHE_DIR / f"{key}.json")
+
+async def llm_fallback(client: AsyncOpenAI, items: List[Tuple[str, str, List[str]]],
+                       mode: str = "batch", failures: Optional[List[Tuple[str, str]]] = None) -> Dict[str, Dict[str, Any]]:
+    """
+    Cached front for the LLM extraction. Answers come from .llm_cache when fresh;
+    families whose answers can't differ (same HTML and needs, no size-dependent
+    field; see llm_cache_key) share one request slot; only the rest go to the
+    API (combined or parallel per `mode`).
+    """
+    keys = {name: llm_cache_key(name, needed, html) for name, html, needed in items}
+    answers: Dict[str, Dict[str, Any]] = {}  # cache key -> extracted fields
+    todo: Dict[str, Tuple[str, str, List[str]]] = {}  # cache key -> first item with it
+    sharing: Dict[str, List[str]] = {}  # cache key -> every family it answers
+    for item in items:
+        key = keys[item[0]]
+        if key in answers:
+            continue
+        if key in todo:
+            sharing[key].append(item[0])
+            continue
+        hit = llm_cache_get(key)
+        if hit is not None:
+            answers[key] = hit
+        else:
+            todo[key] = item
+            sharing[key] = [item[0]]
+
+    if todo:
+        if mode == "parallel":
+            families = {todo[key][0]: names for key, names in sharing.items()}
+            fresh = await llm_extract_parallel(client, list(todo.values()), failures, families)
+        else:
+            fresh = await llm_extract_fields(client, list(todo.values()))
+        for key, (name, _, _) in todo.items():
+            if name in fresh:
+                answers[key] = fresh[name]
+                if any(v is not None for v in fresh[name].values()):  # don't pin a miss for a week
+                    llm_cache_put(key, fresh[name])
+
+    return {name: answers[keys[name]] for name, _, _ in items if keys[name] in answers}
+
+async def llm_explain_errors(client: Optional[AsyncOpenAI], failures: List[Tuple[str, str]]) -> str:
+    """
+    Report every failure of the run in one block: `failures` is a list of
+    (families, error text). With a client, one LLM summary covering all of
+    them is streamed to stdout as it arrives; otherwise the raw errors are
+    printed. Returns the printed text.
+    """
+    print("—"*60)
+    print("ERROR:", "; ".join(families for families, _ in failures))
     if not client:
-        return err_text
-    prompt = (
-        "Summarize this Python scraping error in one paragraph with a bullet list of likely fixes. "
-        "Keep it concise and actionable:\n\n" + err_text
-    )
-    resp = client.responses.create(model="gpt-4.1-mini", input=prompt, temperature=0.2)
-    return resp.output_text.strip()
+        text = "\n".join(err for _, err in failures)
+        print(text)
+    else:
+        items = [{"families": families, "error": err} for families, err in failures]
+        prompt = (
+            "Summarize each of these Python scraping errors in one paragraph with a bullet list of likely fixes, "
+            "headed by its families. Keep it concise and actionable:\n\n" + json.dumps(items, indent=1, ensure_ascii=False)
+        )
+        try:
+            async with client.responses.stream(model=EXPLAIN_MODEL, input=prompt, temperature=0.2) as stream:
+                async for event in stream:
+                    if event.type == "response.output_text.delta":
+                        sys.stdout.write(event.delta)
+                        sys.stdout.flush()
+                resp = await stream.get_final_response()
+            print()
+            text = resp.output_text.strip()
+        except Exception as e:
+            # no summary; the raw errors still get reported
+            text = "\n".join(err for _, err in failures) + f"\n(error summary failed: {e!r})"
+            print(text)
+    print("—"*60)
+    return text
 
 # ---------- Browser ----------
 
-def launch_browser(headless: bool):
-    p = sync_playwright().start()
-    browser = p.chromium.launch(headless=headless)
-    ctx = browser.new_context(
+async def launch_browser(p, headless: bool):
+    browser = await p.chromium.launch(headless=headless)
+    ctx = await browser.new_context(
         user_agent=("Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
                     "AppleWebKit/537.36 (KHTML, like Gecko) "
                     "Chrome/124.0.0.0 Safari/537.36"),
         viewport={"width": 1440, "height": 1000},
         locale="en-IN",
     )
-    page = ctx.new_page()
-    return p, browser, ctx, page
+    await ctx.route("**/*", block_heavy_requests)
+    return browser, ctx
 
-def get_html(page, url: str, timeout: int = 60) -> str:
-    page.set_default_timeout(timeout * 1000)
-    page.goto(url, wait_until="networkidle")
-    time.sleep(0.8)
-    return page.content()
+async def block_heavy_requests(route):
+    req = route.request
+    if req.resource_type in BLOCKED_RESOURCE_TYPES or any(m in req.url for m in BLOCKED_URL_MARKERS):
+        await route.abort()
+    else:
+        await route.continue_()
+
+class PagePool:
+    """
+    Pre-opened tabs on one context; acquire() waits until a tab is free.
+    """
+    def __init__(self, pages: List[Any]):
+        self._queue: asyncio.Queue = asyncio.Queue()
+        for page in pages:
+            self._queue.put_nowait(page)
+
+    @classmethod
+    async def create(cls, ctx, size: int) -> "PagePool":
+        return cls([await ctx.new_page() for _ in range(size)])
+
+    @asynccontextmanager
+    async def acquire(self):
+        page = await self._queue.get()
+        try:
+            yield page
+        finally:
+            self._queue.put_nowait(page)
+
+    async def close(self):
+        while not self._queue.empty():
+            await self._queue.get_nowait().close()
+
+async def get_html(page, url: str, timeout: int = 60, ready_selector: str = MKT_READY_SELECTOR) -> str:
+    from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+    await page.goto(url, wait_until="domcontentloaded", timeout=timeout * 1000)
+    try:
+        await page.wait_for_selector(ready_selector, timeout=SETTLE_TIMEOUT_S * 1000)
+    except PlaywrightTimeoutError:
+        pass  # parse whatever rendered; missing fields go to the LLM fallback
+    return await page.content()
 
 # ---------- Parsers (regex-first; LLM fallback) ----------
 
-PRICE_RE = re.compile(r"(?:From|Starting at)\s*₹\s?(\d[\d,]*)", re.I)
-ANY_INR_RE = re.compile(r"₹\s?(\d[\d,]*)")
-GRAM_RE = re.compile(r"(\d{2,4})\s*g\b", re.I)
-INCH_RE = re.compile(r"(\d+(?:\.\d+)?)\s*(?:[\"”]|-?inch|\s?in)\b", re.I)
-CHIP_RE = re.compile(r"\b(M\d+(?:\s?(Pro|Max))?|A\d+\s?Pro|A\d+)\b", re.I)
-PORTS_THOR = re.compile(r"Thunderbolt\s*/?\s*USB\s*4", re.I)
-PORTS_USBC = re.compile(r"USB[\-\u2011\u2013\u2014]?C", re.I)
-STORAGE_GB_RE = re.compile(r"(\d{2,5})\s*GB", re.I)
-STORAGE_TB_RE = re.compile(r"(\d)\s*TB", re.I)
-
-def parse_price_inr(html: str, size_hint: float) -> Optional[float]:
+# One alternation, one named group per field; <script>/<style> blocks match the
+# "skip" branch first so JSON blobs and CSS never feed the field lists.
+# Kept to the RE2-compatible subset (inline flags, no backreferences) so the
+# same pattern compiles under google-re2 when it's installed.
+# page.content() serializes non-breaking spaces as "&nbsp;" (e.g. "582&nbsp;g",
+# "USB&nbsp;4"), so every separator position accepts that entity too
+SP = r"(?:\s|&nbsp;)"
+MEGA_PATTERN = (
+    r"(?is)(?P<skip><script\b[^>]*>.*?</script\s*>|<style\b[^>]*>.*?</style\s*>)"
+    r"|₹" + SP + r"?(?P<price>\d[\d,]*)"
+    r"|(?P<grams>\d{2,4})" + SP + r"*g\b"
+    r"|(?P<inch>\d+(?:\.\d+)?)" + SP + r"*(?:[\"”]|-?inch|" + SP + r"?in)\b"
+    r"|\b(?P<chip>M\d+(?:" + SP + r"?(?:Pro|Max))?|A\d+" + SP + r"?Pro|A\d+)\b"
+    r"|(?P<thunderbolt>Thunderbolt" + SP + r"*/?" + SP + r"*USB" + SP + r"*4)"
+    "|(?P<usbc>USB[\\-\u2011\u2013\u2014]?C)"
+    r"|(?P<gb>\d{2,5})" + SP + r"*GB"
+    r"|(?P<tb>\d)" + SP + r"*TB"
+)
+# re.ASCII: \d/\s/\b only need ASCII here (RE2 classes already are); the
+# literal ₹, ” and dash characters still match as-is.
+MEGA_RE = re2.compile(MEGA_PATTERN) if re2 else re.compile(MEGA_PATTERN, re.ASCII)
+FIELD_GROUPS = ("price", "grams", "inch", "chip", "thunderbolt", "usbc", "gb", "tb")
+
+def parse_all(html: str) -> Dict[str, List[str]]:
+    """
+    Single pass over the page: every field match, in document order, by group name.
+    """
+    fields: Dict[str, List[str]] = {name: [] for name in FIELD_GROUPS}
+    for m in MEGA_RE.finditer(html):
+        name = m.lastgroup
+        if name != "skip":
+            fields[name].append(m.group(name))
+    return fields
+
+@dataclass(frozen=True)
+class ParsedBundle:
+    """
+    Typed field values found on one page, in document order.
+    """
+    prices: Tuple[int, ...]
+    grams: Tuple[int, ...]
+    inches: Tuple[float, ...]
+    chips: Tuple[str, ...]
+    thunderbolt: bool
+    usbc: bool
+    storage_gb: FrozenSet[int]  # every GB/TB capacity mentioned, in GB
+
+@lru_cache(maxsize=16)
+def parse_html(html: str) -> ParsedBundle:
+    """
+    parse_all() + conversion, memoized per HTML string so a page shared by
+    several families is scanned once.
+    """
+    f = parse_all(html)
+    return ParsedBundle(
+        prices=tuple(int(x.replace(",", "")) for x in f["price"]),
+        grams=tuple(int(x) for x in f["grams"]),
+        inches=tuple(float(x) for x in f["inch"]),
+        chips=tuple(x.replace("&nbsp;", " ").replace("  ", " ") for x in f["chip"]),
+        thunderbolt=bool(f["thunderbolt"]),
+        usbc=bool(f["usbc"]),
+        storage_gb=frozenset([int(x) for x in f["gb"]] + [int(x) * 1000 for x in f["tb"]]),
+    )
+
+TECH_SPECS_SELECTOR = "section.tech-specs, section.techspecs, section[class*=specs], section[id*=specs]"
+WS_RE = re.compile(r"\s+")
+
+def extract_relevant(html: str) -> str:
+    """
+    The slices of a page worth sending to the LLM, as plain text: the tech-specs
+    section and a window starting just before the first ₹ (LLM_SNIPPET_CHARS max).
+    """
+    from selectolax.lexbor import LexborHTMLParser
+    tree = LexborHTMLParser(html)
+    tree.strip_tags(["script", "style", "noscript"])
+
+    def text_of(node) -> str:
+        return WS_RE.sub(" ", node.text(separator=" ", strip=True)).strip()
+
+    half = LLM_SNIPPET_CHARS // 2
+    slices = []
+    spec = tree.css_first(TECH_SPECS_SELECTOR)
+    if spec is not None:
+        slices.append(text_of(spec)[:half])
+    root = tree.body or tree.root
+    text = text_of(root) if root is not None else ""
+    i = text.find("₹")
+    if i >= 0:
+        start = max(0, i - half // 4)
+        slices.append(text[start:start + half])
+    return " … ".join(slices) if slices else text[:LLM_SNIPPET_CHARS]
+
+def parse_price_inr(page: ParsedBundle, size_hint: float) -> Optional[float]:
     """
     On Pro/Air buy pages there can be two 'From' prices (11 vs 13).
     Heuristic: collect all INR and pick min for ~11-inch, max for ~13-inch.
     """
-    text = BeautifulSoup(html, "lxml").get_text(" ", strip=True)
-    nums = [int(x.replace(",", "")) for x in ANY_INR_RE.findall(text)]
-    if not nums:
+    if not page.prices:
         return None
-    nums = sorted(set(nums))
+    nums = sorted(set(page.prices))
     if size_hint >= 12.8 and len(nums) > 1:
         return float(max(nums))
     return float(min(nums))
 
-def parse_weight_kg(html: str) -> Optional[float]:
-    m = GRAM_RE.search(html)
-    if not m:
+def parse_weight_kg(page: ParsedBundle) -> Optional[float]:
+    if not page.grams:
         return None
-    grams = int(m.group(1))
-    return round(grams / 1000.0, 3)
+    return round(page.grams[0] / 1000.0, 3)
 
-def parse_display_inches(html: str) -> Optional[float]:
-    m = INCH_RE.search(html)
-    return float(m.group(1)) if m else None
+def parse_display_inches(page: ParsedBundle) -> Optional[float]:
+    return page.inches[0] if page.inches else None
 
-def parse_chip(html: str) -> Optional[str]:
-    m = CHIP_RE.search(html)
-    return m.group(0).replace("  ", " ") if m else None
+def parse_chip(page: ParsedBundle) -> Optional[str]:
+    return page.chips[0] if page.chips else None
 
-def parse_ports(html: str) -> Optional[str]:
-    if PORTS_THOR.search(html):
+def parse_ports(page: ParsedBundle) -> Optional[str]:
+    if page.thunderbolt:
         return "USB-C (Thunderbolt/USB 4)"
-    if PORTS_USBC.search(html):
+    if page.usbc:
         return "USB-C"
     return None
 
-def parse_storage_bounds(html: str) -> (Optional[int], Optional[int]):
-    gbs = [int(x) for x in STORAGE_GB_RE.findall(html)]
-    tbs = [int(x) * 1000 for x in STORAGE_TB_RE.findall(html)]
-    all_caps = sorted(set(gbs + tbs))
+def parse_storage_bounds(*pages: ParsedBundle) -> (Optional[int], Optional[int]):
+    all_caps = frozenset().union(*(page.storage_gb for page in pages))
     if not all_caps:
         return None, None
     return min(all_caps), max(all_caps)
 
 # ---------- Main scrape ----------
 
-def scrape_ipads(region: str, out_dir: Path, headless: bool, timeout: int) -> Path:
+def family_urls(family: Tuple[str, float, str, str], region: str) -> Tuple[str, str]:
+    _, _, buy_key, mkt_key = family
+    return (BUY_URLS[buy_key].format(region=region.lower()),
+            MKT_URLS[mkt_key].format(region=region.lower()))
+
+async def fetch_page(pool: PagePool, url: str, timeout: int, ready_selector: str) -> str:
+    async with pool.acquire() as page:
+        return await get_html(page, url, timeout, ready_selector)
+
+def family_fields(family: Tuple[str, float, str, str],
+                  buy: ParsedBundle, mkt: ParsedBundle) -> Dict[str, Any]:
+    """
+    Pick one family's fields out of its parsed BUY + marketing pages.
+    Keys match WANTED_TEMPLATE; None where the regexes found nothing.
+    """
+    size_hint = family[1]
+    base_gb, max_gb = parse_storage_bounds(mkt, buy)
+    return {
+        "price_inr": parse_price_inr(buy, size_hint),
+        "weight_kg": parse_weight_kg(mkt),  # Wi-Fi model weight is usually in Tech Specs
+        "display_inches": parse_display_inches(mkt) or size_hint,
+        "chip": parse_chip(mkt) or parse_chip(buy),
+        "ports": parse_ports(mkt) or parse_ports(buy),
+        "storage_gb_min": base_gb,
+        "storage_gb_max": max_gb,
+    }
+
+def failure_entry(names: List[str], err: BaseException) -> Tuple[str, str]:
+    """
+    (families, error text) for llm_explain_errors.
+    """
+    families = ", ".join(names)
+    tb = "".join(traceback.format_exception(err))
+    return families, f"[{families}] scrape failed: {err}\n{tb}"
+
+def build_row(family: Tuple[str, float, str, str], region: str, fields: Dict[str, Any]) -> Dict[str, Any]:
+    price_inr, max_gb = fields["price_inr"], fields["storage_gb_max"]
+    return {
+        "name": family[0],
+        "category": "ipad",
+        "url": family_urls(family, region)[0],
+        "chip": fields["chip"],
+        "ram_gb": None,                      # Apple doesn't list RAM on marketing pages
+        "storage_gb": fields["storage_gb_min"],
+        "storage_tb": (max_gb/1000.0) if max_gb else None,
+        "battery_hours": 10.0,               # Apple's standard iPad claim (web/video)
+        "weight_kg": fields["weight_kg"],
+        "price_inr": float(price_inr) if price_inr else None,
+        "ports": fields["ports"],
+        "display_inches": fields["display_inches"],
+        "notes": "India ‘From’ price; Wi-Fi model weight.",
+        "learning_hours": None,
+        "maintenance_hours_per_year": None,
+        "power_adequacy_score": None,
+    }
+
+async def scrape_ipads(region: str, out_dir: Path, headless: bool, timeout: int,
+                      llm_fallback_mode: str = "batch") -> Path:
+    from playwright.async_api import async_playwright
     ensure_dir(out_dir)
     client = get_client()
 
-    p, browser, ctx, page = launch_browser(headless=headless)
-    try:
-        rows: List[Dict[str, Any]] = []
-        for name, size_hint, buy_key, mkt_key in FAMILIES:
+    # Families share pages (Pro 11/13, Air 11/13): fetch each URL once (parse_html
+    # memoizes the parse)
+    urls = {family[0]: family_urls(family, region) for family in FAMILIES}
+    selectors: Dict[str, str] = {}
+    for buy_url, mkt_url in urls.values():
+        selectors[buy_url] = BUY_READY_SELECTOR
+        selectors[mkt_url] = MKT_READY_SELECTOR
+
+    async with async_playwright() as p:
+        browser, ctx = await launch_browser(p, headless=headless)
+        pool = await PagePool.create(ctx, MAX_CONCURRENT_PAGES)
+        try:
+            results = await asyncio.gather(
+                *[fetch_page(pool, url, timeout, sel) for url, sel in selectors.items()],
+                return_exceptions=True,
+            )
+        finally:
+            await pool.close()
+            await ctx.close(); await browser.close()
+    html_cache = dict(zip(selectors, results))
+
+    fetched: Dict[str, Dict[str, Any]] = {}
+    failed: Dict[BaseException, List[str]] = {}  # one entry per failed page, with the families it broke
+    for family in FAMILIES:
+        name = family[0]
+        buy_url, mkt_url = urls[name]
+        err = next((html_cache[u] for u in (buy_url, mkt_url) if isinstance(html_cache[u], BaseException)), None)
+        if err is None:
             try:
-                buy_url = BUY_URLS[buy_key].format(region=region.lower())
-                mkt_url = MKT_URLS[mkt_key].format(region=region.lower())
-
-                buy_html = get_html(page, buy_url, timeout)
-                mkt_html = get_html(page, mkt_url, timeout)
-
-                # Regex-first
-                price_inr = parse_price_inr(buy_html, size_hint)
-                weight_kg = parse_weight_kg(mkt_html)  # Wi-Fi model weight is usually in Tech Specs
-                display_in = parse_display_inches(mkt_html) or size_hint
-                chip = parse_chip(mkt_html) or parse_chip(buy_html)
-                ports = parse_ports(mkt_html) or parse_ports(buy_html)
-                base_gb, max_gb = parse_storage_bounds(mkt_html + " " + buy_html)
-
-                # LLM fallback for any missing field
-                if client and (price_inr is None or weight_kg is None or chip is None or ports is None or base_gb is None or max_gb is None):
-                    wanted = {
-                        "price_inr": "From price in INR (Wi-Fi model) as a number (e.g., 99900).",
-                        "weight_kg": "Wi-Fi model weight in kilograms as a number (e.g., 0.444).",
-                        "display_inches": "Diagonal display size in inches as a float (e.g., 11.1).",
-                        "chip": "Chip string like 'M4', 'M3', 'A16', 'A17 Pro'.",
-                        "ports": "Either 'USB-C' or 'USB-C (Thunderbolt/USB 4)'.",
-                        "storage_gb_min": "Base storage (smallest capacity) in GB as a number.",
-                        "storage_gb_max": "Max storage in GB as a number.",
-                    }
-                    llm_res = llm_extract_fields(client, mkt_html + "\n\n" + buy_html, wanted)
-                    price_inr = price_inr or llm_res.get("price_inr")
-                    weight_kg = weight_kg or llm_res.get("weight_kg")
-                    display_in = display_in or llm_res.get("display_inches")
-                    chip = chip or llm_res.get("chip")
-                    ports = ports or llm_res.get("ports")
-                    base_gb = base_gb or llm_res.get("storage_gb_min")
-                    max_gb = max_gb or llm_res.get("storage_gb_max")
-
-                rows.append({
-                    "name": name,
-                    "category": "ipad",
-                    "url": buy_url,
-                    "chip": chip,
-                    "ram_gb": None,                      # Apple doesn't list RAM on marketing pages
-                    "storage_gb": base_gb,
-                    "storage_tb": (max_gb/1000.0) if max_gb else None,
-                    "battery_hours": 10.0,               # Apple's standard iPad claim (web/video)
-                    "weight_kg": weight_kg,
-                    "price_inr": float(price_inr) if price_inr else None,
-                    "ports": ports,
-                    "display_inches": display_in,
-                    "notes": "India ‘From’ price; Wi-Fi model weight.",
-                    "learning_hours": None,
-                    "maintenance_hours_per_year": None,
-                    "power_adequacy_score": None,
-                })
+                fetched[name] = family_fields(family, parse_html(html_cache[buy_url]), parse_html(html_cache[mkt_url]))
+                continue
             except Exception as e:
-                tb = traceback.format_exc()
-                msg = f"[{name}] scrape failed: {e}\n{tb}"
-                print("—"*60)
-                print("ERROR:", name)
-                print(llm_explain_error(client, msg))
-                print("—"*60)
-
-        df = pd.DataFrame(rows, columns=[
-            "name","category","url","chip","ram_gb","storage_gb","storage_tb",
-            "battery_hours","weight_kg","price_inr","ports","display_inches",
-            "notes","learning_hours","maintenance_hours_per_year","power_adequacy_score"
-        ])
-        csv_path = out_dir / f"ipads_india_specs_{date.today().isoformat()}.csv"
-        df.to_csv(csv_path, index=False)
-        print(f"✅ Wrote: {csv_path}")
-        return csv_path
-    finally:
-        ctx.close(); browser.close()
+                err = e
+        failed.setdefault(err, []).append(name)
+    failures = [failure_entry(names, err) for err, names in failed.items()]
+
+    # LLM fallback for the fields each family is missing (families with none
+    # are skipped): one combined request ("batch") or one request per family
+    # in flight together ("parallel")
+    missing_by_family = {name: [k for k in WANTED_TEMPLATE if fields[k] is None] for name, fields in fetched.items()}
+    missing_by_family = {name: missing for name, missing in missing_by_family.items() if missing}
+    if client and missing_by_family:
         try:
-            # stop Playwright cleanly
-            page.context.browser._impl_obj._loop._playwright.stop()
-        except Exception:
-            pass
+            # LLM snippets only for the pages of families that need the fallback
+            snippets: Dict[str, str] = {}
+            pending = []
+            for name, missing in missing_by_family.items():
+                for url in urls[name]:
+                    if url not in snippets:
+                        snippets[url] = extract_relevant(html_cache[url])
+                buy_url, mkt_url = urls[name]
+                pending.append((name, snippets[mkt_url] + "\n\n" + snippets[buy_url], missing))
+            llm_res = await llm_fallback(client, pending, mode=llm_fallback_mode, failures=failures)
+        except Exception as e:
+            # keep the regex values; the rows still get written
+            failures.append(failure_entry(list(missing_by_family), e))
+            llm_res = {}
+        for name, missing in missing_by_family.items():
+            fields, got = fetched[name], llm_res.get(name, {})
+            for k in missing:
+                fields[k] = coerce_llm_value(k, got.get(k))
+
+    csv_path = out_dir / f"ipads_india_specs_{date.today().isoformat()}.csv"
+    with csv_path.open("w", newline="", encoding="utf-8") as f:
+        w = csv.DictWriter(f, fieldnames=COLUMNS)
+        w.writeheader()
+        for family in FAMILIES:
+            if family[0] in fetched:
+                w.writerow(build_row(family, region, fetched[family[0]]))
+    # Every failure of the run (pages, parsing, LLM fallback) in one summary call
+    if failures:
+        await llm_explain_errors(client, failures)
+    print(f"✅ Wrote: {csv_path}")
+    return csv_path
 
 # ---------- Utils ----------
 
@@ -288,10 +656,13 @@ def main():
     ap.add_argument("--out", default="out", help="Output folder.")
     ap.add_argument("--headless", action="store_true", help="Run headless browser.")
     ap.add_argument("--timeout", type=int, default=60, help="Per-page timeout seconds.")
+    ap.add_argument("--llm-fallback", choices=["batch", "parallel"], default="batch",
+                    help="One combined LLM request for all families (batch) or one per family, concurrently (parallel).")
     args = ap.parse_args()
 
     out_dir = Path(args.out); ensure_dir(out_dir)
-    scrape_ipads(region=args.region, out_dir=out_dir, headless=args.headless, timeout=args.timeout)
+    asyncio.run(scrape_ipads(region=args.region, out_dir=out_dir, headless=args.headless, timeout=args.timeout,
+                            llm_fallback_mode=args.llm_fallback))
 
 if __name__ == "__main__":
     main()